@@ -1,9 +1,13 @@
-from enum import Enum, auto 
+import re
+import sys
+from functools import partial
+from enum import IntEnum, auto 
 #for enumerating some of the tokens we will deal with, auto simplifies this by automatically assigning a unique value to each token 
 
 #enums for a limited version of lua
 #just consists of basic loops and operations
-class TokenType(Enum):
+#IntEnum so comparing token types is a plain int compare instead of Enum.__eq__
+class TokenType(IntEnum):
     IDENTIFIER = auto()
     NUMBER = auto()
     STRING = auto()
@@ -33,9 +37,39 @@ class TokenType(Enum):
     DOTDOT = auto() #concat
     EOF = auto()
 
+    #keep printing as TokenType.NAME like a normal Enum instead of the bare int
+    #written out because IntEnum formats as an int on some python versions
+    def __str__(self):
+        return f"{type(self).__name__}.{self.name}"
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+#char class tables indexed by char code, used to pick the handler for the first char of a token
+_IDENT_START = bytes(1 if chr(i).isalpha() or chr(i) == '_' else 0 for i in range(256))
+_DIGIT = bytes(1 if '0' <= chr(i) <= '9' else 0 for i in range(256))
+
+#the rest of an identifier/number after its first char, matched in one call instead of a python loop per char
+_IDENT_REST = re.compile(r'\w*')
+_NUMBER_REST = re.compile(r'[0-9]*(?:\.[0-9]+)?')
+#a run of whitespace that stays on the current line (indentation)
+_WHITESPACE_RUN = re.compile(r'[^\S\n]*')
+
+#operators that can take a second char, looked up by the two chars at the token start
+#if the pair is not here the first char stands alone
+_OPERATOR_PAIRS = {
+    "==": TokenType.EQUAL_EQUAL,
+    ">=": TokenType.GREATER_EQUAL,
+    "<=": TokenType.LESS_EQUAL,
+    "..": TokenType.DOTDOT,
+}
+
 #create a class for token behaviors
 
 class Token:
+    #fixed set of fields, no per token __dict__ (there is one of these per lexeme)
+    __slots__ = ('type', 'value', 'line', 'column')
+
     #constructor for the token, stores enum type,  value and what line and column it is in
     #if none is give, default to 0
     def __init__(self, type, value=None, line=0, column=0):
@@ -60,10 +94,13 @@ class Lexer:
     
         self.source = source
         self.tokens = []
+        #bound once, add_token runs for every token
+        self._append_token = self.tokens.append
         self.start = 0
         self.current = 0
         self.line = 1
-        self.column = 1
+        #index of the first char of the current line, columns are worked out from it when a token is emitted
+        self.line_start = 0
 
         #take note of keywords
         self.keywords = {
@@ -77,178 +114,153 @@ class Lexer:
             "return": TokenType.RETURN,
             "local": TokenType.LOCAL           
         }
+        #bound once, identifier() calls it for every name
+        self._keyword_type = self.keywords.get
+
+        #build the dispatch table once, scan_token just indexes it with the char code
+        self._dispatch = self.build_dispatch()
+
         #tokenize the given source code
         self.tokenize()
 
+    def build_dispatch(self):
+        #one handler per char code in the latin-1 range, anything not listed is an unexpected char
+        dispatch = [self.unexpected] * 256
+
+        for code in range(256):
+            if chr(code).isspace():
+                dispatch[code] = self.whitespace
+            elif _IDENT_START[code]:
+                dispatch[code] = self.identifier
+            elif _DIGIT[code]:
+                dispatch[code] = self.number
+
+        dispatch[ord('\n')] = self.newline
+        dispatch[ord('"')] = partial(self.string, '"')
+        dispatch[ord("'")] = partial(self.string, "'")
+
+        #single char tokens
+        for char, type in (('+', TokenType.PLUS), ('*', TokenType.STAR), ('/', TokenType.SLASH),
+                           ('(', TokenType.LPAREN), (')', TokenType.RPAREN), (',', TokenType.COMMA),
+                           (';', TokenType.SEMICOLON)):
+            dispatch[ord(char)] = partial(self.add_token, type, char)
+
+        #tokens that may have a second char (==, >=, <=, ..), a lone . is not a token
+        dispatch[ord('=')] = partial(self.operator, '=', TokenType.ASSIGN)
+        dispatch[ord('>')] = partial(self.operator, '>', TokenType.GREATER)
+        dispatch[ord('<')] = partial(self.operator, '<', TokenType.LESS)
+        dispatch[ord('.')] = partial(self.operator, '.', None)
+
+        dispatch[ord('-')] = self.minus
+
+        #chars past latin-1 show up as ? in the byte view, the handler tells them apart from a real ?
+        dispatch[ord('?')] = self.non_latin1
+        return dispatch
+
     def tokenize(self):
+        #bind these once instead of looking them up for every char
+        self._src = self.source
+        self._src_len = len(self.source)
+        #one byte per char view of the source, indexing it gives the char code directly (no ord() on a 1 char str)
+        #chars that do not fit in a byte become ? so the indices still line up with the str
+        self._codes = self.source.encode('latin-1', 'replace')
+        src_len = self._src_len
+        scan_token = self.scan_token
+
         #checks if the tokenizer is at the end of the source code
-        while not self.is_at_end():
+        while self.current < src_len:
             #moves forward by getting current as start and scans theh token
             self.start = self.current
-            self.scan_token()
+            scan_token()
 
         #at the end, specify an End of file by appending a Token EOF at the edge
-        self.tokens.append(Token(TokenType.EOF, None, self.line,self.column))
-
-    def is_at_end(self):
-        return self.current >= len(self.source)
-    
-    #advances the progression of the "pointer" in the lexer
-    def advance(self):
-        #goes to the current char and moves the current pointer forward
-        #this stores the char we have at the actual current for processing
-        char = self.source[self.current]
-        self.current += 1
-        self.column += 1
+        self.tokens.append(Token(TokenType.EOF, None, self.line, self.current - self.line_start + 1))
 
-        #return the used char
-        return char
-    
-    #2 peeks to look ahead without "eating" the token early, unlike advance
-    
-    #peek is for the current character
-    def peek(self):
-        if self.is_at_end():
-            return '\0'
-        return self.source[self.current]
-    
-    #peek_next is for the character ahead
-    def peek_next(self):
-        if self.current + 1 >= len(self.source):
-            return '\0'
-        return self.source[self.current + 1]
-    
-    def match(self, expected):
-        
-        #checks if it is at the end or does not match the expected token, return false
-        if self.is_at_end() or self.source[self.current] != expected:
-            return False
-        
-        #else, move forward and confirm a match on current
-        self.current += 1
-        self.column += 1
-        return True
-    
-    def add_token(self, type, value = None):
-        text = self.source[self.start:self.current]
-        self.tokens.append(Token(
+    #every caller already has the value (the fixed text of an operator, a keyword/name, a converted number, a string body)
+    #so nothing gets sliced out of the source here
+    def add_token(self, type, value):
+        self._append_token(Token(
             type,
-            #if value is not null return value else return none
-            value if value is not None else text,
+            value,
             #indicates correct position of token
             self.line,
-            self.column - (self.current - self.start)
+            self.start - self.line_start + 1
         ))
 
     #scans the tokens and verifies what character they take
     def scan_token(self):
-        char = self.advance()
+        self.current += 1
+        self._dispatch[self._codes[self.start]]()
+
+    def non_latin1(self):
+        char = self._src[self.start]
+        if char == '?':
+            self.unexpected()
+        else:
+            #outside the table, fall back to the unicode checks
+            self.scan_unicode(char)
 
+    def scan_unicode(self, char):
         if char.isspace():
-            #checks to see if the space is a newline, if true move line up
-            if char == '\n':
-                self.line += 1
-                self.column = 1
             return
-        
-        #checks to see if it is the alphabet or an _
-        if char.isalpha() or char == '_':
-            #checks to see if the entire thing is an identifier
+        if char.isalpha():
             self.identifier()
             return
+        self.unexpected()
 
-        #checks if it is a digit
-        if char.isdigit():
-            #confirms if it is a digit
-            self.number()
-            return
-        
-        #potential string
-        if char == '"' or char == "'":
-            #checks if it is actually a string
-            self.string(char)
-            return
-        
-        # assess single char tokens
-        if char == '=':
-            # check for ==
-            if self.peek() == '=':
-                self.advance()
-                self.add_token(TokenType.EQUAL_EQUAL)
-            else:
-                self.add_token(TokenType.ASSIGN)
-        elif char == '>':
-            # check for >=
-            if self.peek() == '=':
-                self.advance()
-                self.add_token(TokenType.GREATER_EQUAL)
-            else:
-                self.add_token(TokenType.GREATER)
-        elif char == '<':
-            # Check for <=
-            if self.peek() == '=':
-                self.advance()
-                self.add_token(TokenType.LESS_EQUAL)
-            else:
-                self.add_token(TokenType.LESS)
-        elif char == '+':
-            self.add_token(TokenType.PLUS)
-        elif char == '-':
-            # check for comments
-            if self.peek() == '-':
-                # comment goes until the end of the line
-                while self.peek() != '\n' and not self.is_at_end():
-                    self.advance()
-            else:
-                #if it is just one - then its a minus
-                self.add_token(TokenType.MINUS)
-        
-        elif char == '*':
-            self.add_token(TokenType.STAR)
-        elif char == '/':
-            self.add_token(TokenType.SLASH)
-        elif char == '(':
-            self.add_token(TokenType.LPAREN)
-        elif char == ')':
-            self.add_token(TokenType.RPAREN)
-        elif char == ',':
-            self.add_token(TokenType.COMMA)
-        elif char == ';':
-            self.add_token(TokenType.SEMICOLON)
-        elif char == '.':
-            if self.peek() == '.':  # handle .. operator
-                self.advance()
-                self.add_token(TokenType.DOTDOT)
-            else:
-                print(f"Unexpected character: {char} at line {self.line}, column {self.column}")
+    def whitespace(self):
+        pass
+
+    def newline(self):
+        #newline, move line up
+        self.line += 1
+        self.line_start = self.current
+        #skip the indentation of the new line in one go instead of dispatching every space
+        self.current = _WHITESPACE_RUN.match(self._src, self.current).end()
+
+    def operator(self, char, single_type):
+        #one table lookup on the char pair instead of peeking at the next char
+        pair = self._src[self.start:self.start + 2]
+        pair_type = _OPERATOR_PAIRS.get(pair)
+        if pair_type is not None:
+            self.current += 1
+            self.add_token(pair_type, pair)
+        elif single_type is not None:
+            self.add_token(single_type, char)
         else:
-            # handles unknown chars
-            print(f"Unexpected character: {char} at line {self.line}, column {self.column}")
+            self.unexpected()
+
+    def minus(self):
+        # check for comments
+        if self.current < self._src_len and self._codes[self.current] == 0x2D:  # -
+            # comment goes until the end of the line, the newline itself is left for the newline handler
+            end = self._src.find('\n', self.current)
+            self.current = self._src_len if end == -1 else end
+        else:
+            #if it is just one - then its a minus
+            self.add_token(TokenType.MINUS, '-')
+
+    def unexpected(self):
+        # handles unknown chars
+        print(f"Unexpected character: {self._src[self.start]} at line {self.line}, column {self.start - self.line_start + 1}")
 
     def identifier(self):
-        #checks to see if the next value is alphanumeric, an underscore or is not yet at the end
-        while(self.peek().isalnum() or self.peek() == '_') and not self.is_at_end():
-            #check further
-            self.advance()
+        #consume the rest of the identifier (alphanumerics and underscores)
+        self.current = _IDENT_REST.match(self._src, self.current).end()
 
         #capture from start to element before current (the entire identifier)
-        text = self.source[self.start:self.current]
+        text = self._src[self.start:self.current]
 
-        type = self.keywords.get(text, TokenType.IDENTIFIER)
-        self.add_token(type)
+        type = self._keyword_type(text)
+        if type is None:
+            #intern names so every use of a variable shares one string, dict lookups on it then hit the identity check
+            self.add_token(TokenType.IDENTIFIER, sys.intern(text))
+        else:
+            self.add_token(type, text)
 
     def number(self):
-        #check integer part
-        while self.peek().isdigit() and not self.is_at_end():
-            self.advance()
-
-        #check if there is a . and nums after it (decimal part)
-        if self.peek() == '.' and self.peek_next().isdigit():
-            #consume the .
-            self.advance()
-
-            while self.peek().isdigit() and not self.is_at_end():
-                self.advance()
+        #consume the integer part and the decimal part if there is a . with nums after it
+        self.current = _NUMBER_REST.match(self._src, self.current).end()
 
         #same slicing with identifiers
         value = self.source[self.start:self.current]
@@ -260,24 +272,29 @@ class Lexer:
             self.add_token(TokenType.NUMBER, int(value))
 
     def string(self, quote_char):
-        #keep consuming characters until we reach the closing quote
-
-        while self.peek() != quote_char and not self.is_at_end():
-            #check for any newlines and move pointer accordingly
-            if self.peek() == '\n':
-                self.line += 1
-                self.column = 1
-            self.advance()
+        #jump straight to the closing quote
+        end = self._src.find(quote_char, self.current)
 
         #for any unterminated strings
-        if self.is_at_end():
+        if end == -1:
+            self.current = self._src_len
+            self.skip_lines(self.start, self.current)
             print(f"Unterminated string at line {self.line}")
             return
         
         #consume the closing quote
-        self.advance()
+        self.current = end + 1
 
         #extract only the string without the quotes
+        #newlines inside are applied after the token is added, so it keeps its starting position
 
         value = self.source[self.start + 1: self.current-1]
         self.add_token(TokenType.STRING, value)
+        self.skip_lines(self.start, self.current)
+
+    def skip_lines(self, start, end):
+        #moves the line counter past newlines that were consumed inside a token
+        newlines = self._src.count('\n', start, end)
+        if newlines:
+            self.line += newlines
+            self.line_start = self._src.rfind('\n', start, end) + 1
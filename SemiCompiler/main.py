@@ -25,6 +25,11 @@ class LuaIDE:
         menubar.add_cascade(label="File", menu=filemenu)  #attach the file menu
         root.config(menu=menubar)  #add the menubar to the window
 
+        #cache for the last compile (source, message, is_error) so an unchanged Run does not redo the whole pipeline
+        self._last_compile = None
+        #how many line numbers are currently shown
+        self._line_count = 0
+
         # create the main UI components
         self.create_editor_panel(dark_bg, text_color)
         self.create_output_panel(dark_bg, text_color)
@@ -80,16 +85,26 @@ class LuaIDE:
     
     #updates the line nums whenever the user presses a key
     def update_line_numbers(self, event=None):
-        # Count the number of lines in the editor by counting each new line instance in the editor
-        lines = self.code_editor.get("1.0", tk.END).count('\n') + 1
-        #create a string of the numbers
-        line_numbers_text = "\n".join(str(i) for i in range(1, lines + 1))
+        # the line of the end index is the line count, no need to copy the whole text out to count newlines
+        lines = int(self.code_editor.index(tk.END).split('.')[0])
+
+        #most keys do not add or remove lines, nothing to redo then
+        if lines == self._line_count:
+            return
 
         #update
         self.line_numbers.config(state='normal')  # Enable edits temporarily
-        self.line_numbers.delete('1.0', tk.END)  # Clear old numbers
-        self.line_numbers.insert('1.0', line_numbers_text)  # Insert new numbers
+        if lines > self._line_count:
+            #only add the new numbers to the end
+            new_numbers = "\n".join(str(i) for i in range(self._line_count + 1, lines + 1))
+            if self._line_count:
+                new_numbers = "\n" + new_numbers
+            self.line_numbers.insert(tk.END + '-1c', new_numbers)
+        else:
+            #only cut the numbers past the last line
+            self.line_numbers.delete(f"{lines}.end", tk.END + '-1c')
         self.line_numbers.config(state='disabled')  # Lock it again
+        self._line_count = lines
 
     def show_welcome_message(self):
         welcome_msg = """Welcome to the Partial Lua Compiler IDE!
@@ -128,16 +143,25 @@ end
 
         self.show_output("Processing your code...\n")
 
+        #same code as the last run, just show the same verdict again
+        if self._last_compile is not None and self._last_compile[0] == code:
+            _, message, is_error = self._last_compile
+            self.show_output(message, is_error=is_error)
+            return
+
         try:
             lexer = Lexer(code)
             parser = Parser(lexer.tokens)
             ast = parser.parse()
             analyzer = SemanticAnalyzer()
-            analyzer.analyze(ast)
-            self.show_output("\nAll checks passed! Your code is valid in this limited Lua subset.")
+            analyzer.analyze_block(ast)
+            message, is_error = "\nAll checks passed! Your code is valid in this limited Lua subset.", False
 
         except Exception as e:
-            self.show_output(f"\nError encountered during compilation:\n{str(e)}", is_error=True)
+            message, is_error = f"\nError encountered during compilation:\n{str(e)}", True
+
+        self._last_compile = (code, message, is_error)
+        self.show_output(message, is_error=is_error)
 
     def show_output(self, message, is_error=False):
         self.output_text.config(state='normal')  # Enable writing
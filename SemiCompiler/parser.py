@@ -1,4 +1,5 @@
-from lexer import TokenType, Token
+from functools import lru_cache
+from lexer import TokenType
 from syntaxtree import (
     NumberNode, StringNode, VariableNode, BinaryOpNode, AssignmentNode,
     IfNode, WhileNode, FunctionNode, FunctionCallNode, ReturnNode, BlockNode
@@ -8,9 +9,40 @@ class ParseError(Exception):
     #just to raise errors in any case
     pass
 
+#binding power of each binary operator, indexed by token type (0 means not a binary operator)
+#lowest to highest: concat, comparison, additive, multiplicative. all of them are left associative
+_PRECEDENCE = [0] * (max(TokenType) + 1)
+_PRECEDENCE[TokenType.DOTDOT] = 1
+for _type in (TokenType.EQUAL_EQUAL, TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
+    _PRECEDENCE[_type] = 2
+_PRECEDENCE[TokenType.PLUS] = _PRECEDENCE[TokenType.MINUS] = 3
+_PRECEDENCE[TokenType.STAR] = _PRECEDENCE[TokenType.SLASH] = 4
+
+#tokens that close a block, built once instead of a new list on every if/while/function
+_IF_BLOCK_END = frozenset((TokenType.ELSE, TokenType.END))
+_BLOCK_END = frozenset((TokenType.END,))
+
+#tokens after a return that mean it has no value
+_RETURN_END = frozenset((TokenType.ELSE, TokenType.END))
+
+#literal nodes are never modified after parsing, so repeated literals (0, 1, "") can share one node
+#typed so 1 and 1.0 stay separate nodes, long strings are not worth keeping around
+_MAX_SHARED_STRING = 64
+
+@lru_cache(maxsize=1024, typed=True)
+def _number_node(value):
+    return NumberNode(value)
+
+@lru_cache(maxsize=1024)
+def _string_node(value):
+    return StringNode(value)
+
 class Parser:
     def __init__(self, tokens):
         self.tokens = tokens
+        #token types pulled out into their own list, nearly every check only needs the type
+        #so the Token objects are only touched when a value or position is actually used
+        self.types = [token.type for token in tokens]
         self.current = 0
 
     def peek(self):
@@ -23,27 +55,28 @@ class Parser:
     
     def is_at_end(self):
         #same as lexer, but checks for EOF instead of input length and current string
-        return self.peek().type == TokenType.EOF
+        return self.types[self.current] == TokenType.EOF
 
     def advance(self):
-        #consumes the token
-        if not self.is_at_end():
+        #consumes the token, reads the list directly instead of going through peek/previous
+        if self.types[self.current] != TokenType.EOF:
             self.current += 1
-        return self.previous()
+        return self.tokens[self.current - 1]
 
     def match(self, *types):
-        #checks if current token matches a type
-        for type in types:
-            if self.check(type):
-                self.advance()
-                return True
+        #checks if current token matches a type, one containment test instead of a check() per type
+        current_type = self.types[self.current]
+        if current_type != TokenType.EOF and current_type in types:
+            self.current += 1
+            return True
         return False
     
     def check(self, type):
         #checks if a current token matches an EXACT type
-        if self.is_at_end():
+        current_type = self.types[self.current]
+        if current_type == TokenType.EOF:
             return False
-        return self.peek().type == type
+        return current_type == type
     
     def consume(self, type, message):
         #consumes a current token if it is one of the types, else return an error with a message
@@ -62,28 +95,30 @@ class Parser:
 
     def parse_statement(self):
         #parses token by token (stament by statement)
-        if self.match(TokenType.IF):
+        #reads the current type once instead of going through match() for every statement kind
+        token_type = self.types[self.current]
+
+        if token_type == TokenType.IF:
+            self.current += 1
             return self.parse_if_statement()
-        elif self.match(TokenType.WHILE):
+        elif token_type == TokenType.WHILE:
+            self.current += 1
             return self.parse_while_statement()
-        elif self.match(TokenType.FUNCTION):
+        elif token_type == TokenType.FUNCTION:
+            self.current += 1
             return self.parse_function_definition()
-        elif self.match(TokenType.RETURN):
+        elif token_type == TokenType.RETURN:
+            self.current += 1
             return self.parse_return_statement()
-        elif self.match(TokenType.LOCAL):
+        elif token_type == TokenType.LOCAL:
+            self.current += 1
             return self.parse_assignment()
-        elif self.check(TokenType.IDENTIFIER) and self.peek_next().type == TokenType.ASSIGN:
+        #an identifier is never the last token (EOF always follows), so the lookahead is safe
+        elif token_type == TokenType.IDENTIFIER and self.types[self.current + 1] == TokenType.ASSIGN:
             return self.parse_assignment()
         else:
             return self.parse_expression_statement()
         
-    def peek_next(self):
-        #lookahead token
-        #if the next current is equal to or greater thanlength of stream then it must be EOF
-        if self.current + 1 >= len(self.tokens):
-            return Token(TokenType.EOF)
-        return self.tokens[self.current + 1]
-    
     def parse_expression_statement(self):
         #parses an expression used as a statment
         expr = self.parse_expression()
@@ -95,10 +130,10 @@ class Parser:
         condition = self.parse_expression()
         self.consume(TokenType.THEN, "Expected 'then' after if")
 
-        then_branch = BlockNode(self.parse_statement_list([TokenType.ELSE, TokenType.END]))
+        then_branch = BlockNode(self.parse_statement_list(_IF_BLOCK_END))
         else_branch = None
         if self.match(TokenType.ELSE):
-            else_branch = BlockNode(self.parse_statement_list([TokenType.END]))
+            else_branch = BlockNode(self.parse_statement_list(_BLOCK_END))
         self.consume(TokenType.END, "Expected 'end' after if/else block")
 
         return IfNode(condition, then_branch, else_branch)
@@ -107,7 +142,7 @@ class Parser:
         #parses a while
         condition = self.parse_expression()
         self.consume(TokenType.DO, "Expected 'do' after while condition")
-        body = BlockNode(self.parse_statement_list([TokenType.END]))
+        body = BlockNode(self.parse_statement_list(_BLOCK_END))
         self.consume(TokenType.END, "Expected 'end' after while body")
         return WhileNode(condition, body)
     
@@ -125,14 +160,14 @@ class Parser:
 
         #checks for ) at end if true check for blocks
         self.consume(TokenType.RPAREN, "Expected ')' after parameters")
-        body = BlockNode(self.parse_statement_list([TokenType.END]))
+        body = BlockNode(self.parse_statement_list(_BLOCK_END))
         self.consume(TokenType.END, "Expected 'end' after function body")
         return FunctionNode(name.value, parameters, body)
     
     def parse_return_statement(self):
         #parses the return
         value = None
-        if not self.check(TokenType.END) and not self.check(TokenType.ELSE):
+        if self.types[self.current] not in _RETURN_END:
             value = self.parse_expression()
         self.match(TokenType.SEMICOLON)  #check again for optional semicolon
         return ReturnNode(value)
@@ -142,7 +177,7 @@ class Parser:
         name = None
 
         #checks for any 'local' keywords 
-        if self.previous().type == TokenType.LOCAL:
+        if self.types[self.current - 1] == TokenType.LOCAL:
             name = self.consume(TokenType.IDENTIFIER, "Expected variable name after 'local'").value
         else:
             name = self.advance().value
@@ -155,73 +190,59 @@ class Parser:
     def parse_statement_list(self, terminator_tokens):
         #parses a list of statements and whatever keyword should terminate this list
         statements = []
-        while not self.is_at_end() and not any(self.check(t) for t in terminator_tokens):
+        types = self.types
+        while True:
+            token_type = types[self.current]
+            if token_type == TokenType.EOF or token_type in terminator_tokens:
+                break
             statements.append(self.parse_statement())
         return statements
     
-    def parse_expression(self):
-        #parses a comparison expression
-        return self.parse_concat()
-    
-    #cool stack tech, we start with comparison, then cascade down to multiplication
-    #why? the stack handles the precedence in this way! since the final call is multiplicative, it will always be the first one to pop out of the list!
-
-    def parse_concat(self):
-        #parses string concat
-        expr = self.parse_comparison()
-        
-        while self.match(TokenType.DOTDOT):
-            operator = self.previous()
-            right = self.parse_comparison()
-            expr = BinaryOpNode(expr, operator, right)
-        
-        return expr
-    
-    def parse_comparison(self):
-        #parses any of the comparative expressions
-        expr = self.parse_additive()
-        while self.match(TokenType.EQUAL_EQUAL, TokenType.GREATER, 
-                        TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.parse_additive()
-            expr = BinaryOpNode(expr, operator, right)
-        return expr
-    
-    def parse_additive(self):
-        #parses addition
-        expr = self.parse_multiplicative()
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            operator = self.previous()
-            right = self.parse_multiplicative()
-            expr = BinaryOpNode(expr, operator, right)
-        return expr
-    
-    def parse_multiplicative(self):
-        #parses multiplicative expressions
+    def parse_expression(self, min_precedence=0):
+        #parses an expression with precedence climbing, one loop over the operator table
+        #instead of a chain of concat -> comparison -> additive -> multiplicative calls for every operand
         expr = self.parse_primary()
-        while self.match(TokenType.STAR, TokenType.SLASH):
-            operator = self.previous()
-            right = self.parse_primary()
+        types = self.types
+
+        #keep folding operators that bind tighter than whatever called us
+        #the right side is parsed at the operator's own precedence, so equal operators are left to this loop (left associative)
+        while True:
+            precedence = _PRECEDENCE[types[self.current]]
+            if precedence <= min_precedence:
+                break
+            operator = self.tokens[self.current]
+            self.current += 1
+            right = self.parse_expression(precedence)
             expr = BinaryOpNode(expr, operator, right)
+
         return expr
     
-    #final stage of the stack calls for expr, checks for actual literals like strings and nums
+    #operands of the expression, checks for actual literals like strings and nums
     def parse_primary(self):
         #parses literals, variables, groupings, func calls
+        token_type = self.types[self.current]
+
         # check if the token is a number
-        if self.match(TokenType.NUMBER):
-            return NumberNode(self.previous().value)
+        if token_type == TokenType.NUMBER:
+            self.current += 1
+            return _number_node(self.tokens[self.current - 1].value)
         
         # check if the token is a string
-        if self.match(TokenType.STRING):
-            return StringNode(self.previous().value)
+        if token_type == TokenType.STRING:
+            self.current += 1
+            value = self.tokens[self.current - 1].value
+            if len(value) <= _MAX_SHARED_STRING:
+                return _string_node(value)
+            return StringNode(value)
         
         # check if the token is an identifier (could be a variable or function name)
-        if self.match(TokenType.IDENTIFIER):
-            name = self.previous().value  # store the identifier's name
+        if token_type == TokenType.IDENTIFIER:
+            self.current += 1
+            name = self.tokens[self.current - 1].value  # store the identifier's name
             
             # if it's followed by ( its a function call
-            if self.match(TokenType.LPAREN):
+            if self.types[self.current] == TokenType.LPAREN:
+                self.current += 1
                 arguments = self.parse_arguments()  # parse function arguments
                 self.consume(TokenType.RPAREN, "Expected ')' after function arguments")  # ensure closing parenthesis
                 return FunctionCallNode(name, arguments)  # return a function call node
@@ -230,13 +251,15 @@ class Parser:
             return VariableNode(name)
         
         # check if the token is ( meaning its a grouped expression
-        if self.match(TokenType.LPAREN):
+        if token_type == TokenType.LPAREN:
+            self.current += 1
             expr = self.parse_expression()  # parse whatever is inside the parentheses
             self.consume(TokenType.RPAREN, "Expected ')' after expression")  # ensure closing parenthesis
             return expr  # return the inner expression
         
         # if none of the above matched, raise a parsing error
-        raise ParseError(f"Unexpected token: {self.peek()} at line {self.peek().line}")
+        token = self.tokens[self.current]
+        raise ParseError(f"Unexpected token: {token} at line {token.line}")
     
     def parse_arguments(self):
         #parses function calls and their arguments
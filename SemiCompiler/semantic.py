@@ -1,56 +1,113 @@
 from lexer import Lexer, TokenType
 from parser import Parser
 from syntaxtree import (
-    NumberNode, StringNode, VariableNode, BinaryOpNode, AssignmentNode,
-    IfNode, WhileNode, FunctionNode, FunctionCallNode, ReturnNode, BlockNode
+    ReturnNode, NODE_KINDS, KIND_NUMBER, KIND_STRING, KIND_VARIABLE, KIND_BINARY_OP,
+    KIND_ASSIGNMENT, KIND_IF, KIND_WHILE, KIND_FUNCTION, KIND_FUNCTION_CALL, KIND_RETURN, KIND_BLOCK
 )
 
 class SemanticError(Exception):
     pass
 
+#the value types, small ints so the checks below are int compares
+T_NUMBER, T_STRING, T_BOOLEAN, T_ANY = range(1, 5)
+
+#names used in error messages
+_TYPE_NAMES = {T_NUMBER: "number", T_STRING: "string", T_BOOLEAN: "boolean", T_ANY: "any"}
+
+#operators that need numbers on both sides, built once instead of a list per binary op
+_ARITH_OPS = frozenset((TokenType.PLUS, TokenType.MINUS, TokenType.STAR, TokenType.SLASH))
+
+#marks a name that was not visible before a scope declared it
+_MISSING = object()
+
 #stores a dictionary of variable and type as well as functions and their parameters
+#there is one flat dict for each, holding whatever is visible right now, so a lookup is a single dict access
+#no matter how deep the nesting is. each open scope remembers what its declarations shadowed and puts it back on exit
 class SymbolTable:
-    def __init__(self, parent = None):
+    def __init__(self):
         self.variables = {}
         self.functions = {}
-        #for consideration in nesting (check parent vars if var is not present in self var)
-        self.parent = parent
+        #one (variables, functions) pair per open scope, name -> value it shadowed (or _MISSING)
+        #also tells which names were declared in that scope, for the duplicate checks
+        #a scope stays None until something is declared in it, most if/while blocks never declare anything
+        self.scopes = [None]
+        #emptied scope pairs kept for reuse, so function after function does not allocate fresh dicts
+        self._scope_pool = []
+
+    def enter_scope(self):
+        #opens a nested scope (function, block)
+        self.scopes.append(None)
+
+    def exit_scope(self):
+        #closes the innermost scope, dropping its names and bringing back what they shadowed
+        scope = self.scopes.pop()
+        if scope is not None:
+            self._restore(self.variables, scope[0])
+            self._restore(self.functions, scope[1])
+            scope[0].clear()
+            scope[1].clear()
+            self._scope_pool.append(scope)
+
+    def _current_scope(self):
+        #the innermost scope's pair, created on the first declaration
+        scope = self.scopes[-1]
+        if scope is None:
+            pool = self._scope_pool
+            scope = self.scopes[-1] = pool.pop() if pool else ({}, {})
+        return scope
+
+    @staticmethod
+    def _restore(table, shadowed):
+        for name, previous in shadowed.items():
+            if previous is _MISSING:
+                del table[name]
+            else:
+                table[name] = previous
 
     def declare_variable(self, name, var_type):
         #declares a variable in the current scope
+        shadowed = self._current_scope()[0]
 
-        if name in self.variables:
+        if name in shadowed:
             #checks for local duplicates
             raise SemanticError(f"Variable '{name}' is already declared in this scope")
-        #add to dictionary 
-        self.variables[name] = var_type
+        #remember what it hides and add to dictionary 
+        variables = self.variables
+        shadowed[name] = variables.get(name, _MISSING)
+        variables[name] = var_type
 
     def get_variable(self, name):
-        #look up the variable in working scope 
-        if name in self.variables:
-            return self.variables[name]
-        #if parent exists and var was not found in self scope
-        #recursively search in parent
-        elif self.parent:
-            return self.parent.get_variable(name)
-        else:
-            raise SemanticError(f"Undefined variable '{name}'.")
+        #look up the variable, the flat dict already has the innermost declaration
+        variables = self.variables
+        if name in variables:
+            return variables[name]
+        raise SemanticError(f"Undefined variable '{name}'.")
+
+    def lookup_variable(self, name):
+        #same as get_variable but gives None instead of raising, for callers where missing is the normal case
+        return self.variables.get(name)
 
     #ensures that var_name(params) is fulfilled, return can be void so its None    
     def declare_function(self, name, param_count, param_types, return_type = None):
         #declares a func in current scope
-        if name in self.functions:
+        shadowed = self._current_scope()[1]
+
+        if name in shadowed:
             raise SemanticError(f"Function '{name}' is already defined.")
+        functions = self.functions
+        shadowed[name] = functions.get(name, _MISSING)
+        functions[name] = (param_count, param_types, return_type)
+
+    def update_function(self, name, param_count, param_types, return_type = None):
+        #replaces the visible entry of an already declared func (e.g. once its return type is known)
         self.functions[name] = (param_count, param_types, return_type)
 
     def get_function(self, name):
         #same stuff from get_var just for funcs
-        if name in self.functions:
-            return self.functions[name]
-        elif self.parent:
-            return self.parent.get_function(name)
-        else:
-            raise SemanticError(f"Undefined function '{name}'.")
+        functions = self.functions
+        if name in functions:
+            return functions[name]
+        raise SemanticError(f"Undefined function '{name}'.")
 
 #very basic semantic check, ensures proper func usage and type compatability
 class SemanticAnalyzer:
@@ -61,16 +118,12 @@ class SemanticAnalyzer:
         #a current func to verify return types with
         self.current_function = None
 
-        #add in default func (print) in limited lua (print, 1, ["any"], None)
+        #add in default func (print) in limited lua (print, 1, [any], None)
         #-1 means args list in python
-        self.symbol_table.declare_function("print", 1, ["any"], None)
+        self.symbol_table.declare_function("print", 1, [T_ANY], None)
 
     def analyze(self, nodes):
-        #analyzes a list of the syntax tree nodes
-
-        #just to make sure singular nodes still get wrapped in a list
-        if not isinstance(nodes, list):
-            nodes = [nodes]
+        #analyzes a list of the syntax tree nodes, callers with a single node wrap it as [node]
 
         #analyze dem
         for node in nodes:
@@ -78,162 +131,215 @@ class SemanticAnalyzer:
 
         #if no exceptions raised it returns true
         return True
+
+    def analyze_block(self, block):
+        #analyzes a whole program, the BlockNode that Parser.parse returns
+        #its statements get their own scope under the global one, same as any other block
+        self._analyze_block(block)
+        return True
     
     def analyze_node(self, node):
         #recursively analyze a specific node
+        #the node's KIND indexes the handler list instead of going through a chain of isinstance checks
+        try:
+            kind = node.KIND
+        except AttributeError:
+            raise SemanticError(f"Unknown AST node type: {type(node)}") from None
+        #number and string literals need no work, their type comes straight from the table without a handler call
+        leaf_type = _LEAF_TYPES[kind]
+        if leaf_type is not None:
+            return leaf_type
+        return _DISPATCH[kind](self, node)
 
-        #check type of token first
-        if isinstance(node, NumberNode):
-            return "number"
+    def _analyze_variable(self, node):
+        return self.symbol_table.get_variable(node.name)
         
-        elif isinstance(node, StringNode):
-            return "string"
+    #recursively check left and right sides
+    def _analyze_binop(self, node):
+        left_type = self.analyze_node(node.left)
+        right_type = self.analyze_node(node.right)
+
+        #check for type of operator, read once for both tests
+        op_type = node.op.type
+        if op_type == TokenType.DOTDOT:
+            #concat .. works with any types in Lua (numbers get converted to strings)
+            return T_STRING
         
-        elif isinstance(node, VariableNode):
-            return self.symbol_table.get_variable(node.name)
+        #arithmetic operator
+        elif op_type in _ARITH_OPS:
+            # In Lua, arithmetic operations try to convert strings to numbers
+            # So we just return number as the result type
+            # BUT we'll add explicit type checking for safety
+            if left_type != T_NUMBER or right_type != T_NUMBER:
+                op = node.op
+                raise SemanticError(
+                    f"Cannot perform arithmetic between {_TYPE_NAMES[left_type]} and {_TYPE_NAMES[right_type]} "
+                    f"at line {op.line}, column {op.column}"
+                )
+            return T_NUMBER
         
-        #recursively check left and right sides
-        elif isinstance(node, BinaryOpNode):
-            left_type = self.analyze_node(node.left)
-            right_type = self.analyze_node(node.right)
-
-            #check for type of operator
-            if node.op.type == TokenType.DOTDOT:
-                #concat .. works with any types in Lua (numbers get converted to strings)
-                return "string"
-            
-            #arithmetic operator
-            elif node.op.type in [TokenType.PLUS, TokenType.MINUS, TokenType.STAR, TokenType.SLASH]:
-                # In Lua, arithmetic operations try to convert strings to numbers
-                # So we just return number as the result type
-                # BUT we'll add explicit type checking for safety
-                if left_type != "number" or right_type != "number":
-                    raise SemanticError(
-                        f"Cannot perform arithmetic between {left_type} and {right_type} "
-                        f"at line {node.op.line}, column {node.op.column}"
-                    )
-                return "number"
-            
-            #remaining binary ops are comparisons
-            else: 
-                # Comparisons work with any types in Lua
-                return "boolean"
-
-        #recursively check whether assignments match
-        elif isinstance(node, AssignmentNode):
-            #determine the type of the expression
-            expr_type = self.analyze_node(node.value)
-
-            if isinstance(node.variable, str):  
-                var_name = node.variable  # assign directly if it's already a string
-            else:
-                var_name = node.variable.name  # otherwise, get the name attribute
+        #remaining binary ops are comparisons
+        else: 
+            # Comparisons work with any types in Lua
+            return T_BOOLEAN
 
-            #try to check if variable exists, if not declare it
-            try: 
-                self.symbol_table.get_variable(var_name)
-            except SemanticError:
-                self.symbol_table.declare_variable(var_name, expr_type)     
+    #recursively check whether assignments match
+    def _analyze_assignment(self, node):
+        #determine the type of the expression
+        expr_type = self.analyze_node(node.value)
 
-            return expr_type      
+        if isinstance(node.variable, str):  
+            var_name = node.variable  # assign directly if it's already a string
+        else:
+            var_name = node.variable.name  # otherwise, get the name attribute
 
-        #recursively check if expression ends up being boolean
-        elif isinstance(node, IfNode):
-            condition_type = self.analyze_node(node.condition)
-            if condition_type != "boolean":
-                raise SemanticError(f"If condition must be boolean, got {condition_type}")
-            
-            # analyze branches
-            self.analyze_node(node.then_branch)
-            if node.else_branch:
-                self.analyze_node(node.else_branch)
+        #check if variable exists, if not declare it
+        symbol_table = self.symbol_table
+        if symbol_table.lookup_variable(var_name) is None:
+            symbol_table.declare_variable(var_name, expr_type)     
 
-            return None
+        return expr_type      
+
+    #recursively check if expression ends up being boolean
+    def _analyze_if(self, node):
+        condition_type = self.analyze_node(node.condition)
+        if condition_type != T_BOOLEAN:
+            raise SemanticError(f"If condition must be boolean, got {_TYPE_NAMES[condition_type]}")
         
-        #same vibes as earlier
-        elif isinstance(node, WhileNode):
-            condition_type = self.analyze_node(node.condition)
-            if condition_type != "boolean":
-                raise SemanticError(f"While condition must be boolean, got {condition_type}")
-            
-            #analyze the body after
-            self.analyze_node(node.body)
-            return None
+        # analyze branches
+        self.analyze_node(node.then_branch)
+        if node.else_branch:
+            self.analyze_node(node.else_branch)
+
+        return None
         
-        elif isinstance(node, FunctionNode):
-            #create a new symbol table only for the locally declared vars in the function, keep parent call since it can still acess that
-            old_symbol_table = self.symbol_table
-            self.symbol_table = SymbolTable(parent = old_symbol_table)
-
-            #save old context of the func and work on current context (for proper returns)
-            old_function = self.current_function
-            self.current_function = node.name
-
-            param_types = [] 
-
-            #paramters can be of any type
-            for param in node.params:
-                param_types.append("any")
-                #declare them as any
-                self.symbol_table.declare_variable(param, "any")
+    #same vibes as earlier
+    def _analyze_while(self, node):
+        condition_type = self.analyze_node(node.condition)
+        if condition_type != T_BOOLEAN:
+            raise SemanticError(f"While condition must be boolean, got {_TYPE_NAMES[condition_type]}")
         
-            return_type = None
+        #analyze the body after
+        self.analyze_node(node.body)
+        return None
+        
+    def _analyze_function(self, node):
+        #the analyzer keeps one symbol table for the whole run, so it is safe to hold on to it across the body
+        symbol_table = self.symbol_table
+        analyze_node = self.analyze_node
+        param_types = [T_ANY] * len(node.params) #paramters can be of any type
 
-            for stmt in node.body.statements: #body is a block node
-                #if node is a returnnode recursively check what type that return is
-                if isinstance(stmt, ReturnNode) and stmt.value:
-                    #return type now takes that value
-                    return_type = self.analyze_node(stmt.value)
-            
-            #declare the function in parent scope before analyzing body
-            old_symbol_table.declare_function(node.name, len(node.params), param_types, return_type)
+        #declare the function in parent scope before analyzing body (so the body can call it)
+        #calls to itself inside the body use the type of the last top-level return that can be worked out up front,
+        #the real return type is filled in once the body has been walked
+        early_return_type = None
+        for stmt in node.body.statements:
+            if isinstance(stmt, ReturnNode) and stmt.value:
+                value_type = self._early_type(stmt.value, node.name)
+                if value_type is not None:
+                    early_return_type = value_type
+        symbol_table.declare_function(node.name, len(node.params), param_types, early_return_type)
 
-            #analyze function body with new symbol table
-            self.analyze_node(node.body)
-            
-            #swap current and old symbol tables, sort of like returning control to the calling function
-            self.symbol_table = old_symbol_table
-            self.current_function = old_function
+        #open a new scope only for the locally declared vars in the function, everything outside stays visible
+        symbol_table.enter_scope()
 
-            return None
+        #save old context of the func and work on current context (for proper returns)
+        old_function = self.current_function
+        self.current_function = node.name
+
+        for param in node.params:
+            #declare them as any
+            symbol_table.declare_variable(param, T_ANY)
+    
+        return_type = None
+
+        #analyze the body once in the function scope, picking up the return type on the way
+        for stmt in node.body.statements: #body is a block node
+            stmt_type = analyze_node(stmt)
+            #if node is a returnnode with a value, the return type now takes that value
+            if isinstance(stmt, ReturnNode) and stmt.value:
+                return_type = stmt_type
         
-        elif isinstance(node, FunctionCallNode):
-            #get function info from symbol table
-            func_info = self.symbol_table.get_function(node.name)
-            #get the deets about the func
-            param_count, param_types, return_type = func_info
-
-            if len(node.arguments) != param_count:
-                #too many or too little arguments
-                raise SemanticError(f"Function '{node.name}' expects {param_count} arguments but got {len(node.arguments)}.")
-            
-            #analyze all arguments (type checking is relaxed like Lua)
-            for arg in node.arguments:
-                self.analyze_node(arg)
-                
-            #if return type is not any return it
-            return return_type if return_type else "any"
+        #close the function scope, sort of like returning control to the calling function
+        symbol_table.exit_scope()
+        self.current_function = old_function
+
+        symbol_table.update_function(node.name, len(node.params), param_types, return_type)
+
+        return None
+
+    def _early_type(self, expr, function_name):
+        #type of a return value worked out without walking it (no checks, nothing declared)
+        #gives None when it depends on variables or on the function itself
+        kind = expr.KIND
+        leaf_type = _LEAF_TYPES[kind]
+        if leaf_type is not None:
+            return leaf_type
+        if kind == KIND_BINARY_OP:
+            op_type = expr.op.type
+            if op_type == TokenType.DOTDOT:
+                return T_STRING
+            elif op_type in _ARITH_OPS:
+                return T_NUMBER
+            return T_BOOLEAN
+        if kind == KIND_FUNCTION_CALL and expr.name != function_name:
+            func_info = self.symbol_table.functions.get(expr.name)
+            if func_info is not None:
+                return func_info[2] or T_ANY
+        return None
+
+    def _analyze_call(self, node):
+        #get function info from symbol table
+        func_info = self.symbol_table.get_function(node.name)
+        arguments = node.arguments
+        argc = len(arguments)
+
+        if argc != func_info[0]:
+            #too many or too little arguments
+            raise SemanticError(f"Function '{node.name}' expects {func_info[0]} arguments but got {argc}.")
         
-        elif isinstance(node, ReturnNode):
-            #checks if return is inside the function
-            if not self.current_function:
-                raise SemanticError("Return statement outside of function.")
+        #analyze all arguments (type checking is relaxed like Lua)
+        analyze_node = self.analyze_node
+        for arg in arguments:
+            analyze_node(arg)
             
-            if node.value:
-                return self.analyze_node(node.value)
-            return None
+        #if return type is not any return it, the type constants are never 0 so or is safe
+        return func_info[2] or T_ANY
+
+    def _analyze_return(self, node):
+        #checks if return is inside the function
+        if not self.current_function:
+            raise SemanticError("Return statement outside of function.")
         
-        #checks if the block has any semantic errors or has unknown types
-        elif isinstance(node, BlockNode):
-            old_symbol_table = self.symbol_table
-            self.symbol_table = SymbolTable(parent=old_symbol_table)
-            
-            for stmt in node.statements:
-                self.analyze_node(stmt)
-            
-            self.symbol_table = old_symbol_table
-            return None
+        if node.value:
+            return self.analyze_node(node.value)
+        return None
+
+    #checks if the block has any semantic errors or has unknown types
+    def _analyze_block(self, node):
+        symbol_table = self.symbol_table
+        analyze_node = self.analyze_node
+        symbol_table.enter_scope()
         
-        else:
-            raise SemanticError(f"Unknown AST node type: {type(node)}")
-        
\ No newline at end of file
+        for stmt in node.statements:
+            analyze_node(stmt)
+        
+        symbol_table.exit_scope()
+        return None
+
+#type of each literal node kind, answered by analyze_node without calling a handler (None for the rest)
+_LEAF_TYPES = [None] * NODE_KINDS
+_LEAF_TYPES[KIND_NUMBER] = T_NUMBER
+_LEAF_TYPES[KIND_STRING] = T_STRING
+
+#handler for each node kind, indexed by analyze_node (literal kinds stay None, _LEAF_TYPES answers them first)
+_DISPATCH = [None] * NODE_KINDS
+_DISPATCH[KIND_VARIABLE] = SemanticAnalyzer._analyze_variable
+_DISPATCH[KIND_BINARY_OP] = SemanticAnalyzer._analyze_binop
+_DISPATCH[KIND_ASSIGNMENT] = SemanticAnalyzer._analyze_assignment
+_DISPATCH[KIND_IF] = SemanticAnalyzer._analyze_if
+_DISPATCH[KIND_WHILE] = SemanticAnalyzer._analyze_while
+_DISPATCH[KIND_FUNCTION] = SemanticAnalyzer._analyze_function
+_DISPATCH[KIND_FUNCTION_CALL] = SemanticAnalyzer._analyze_call
+_DISPATCH[KIND_RETURN] = SemanticAnalyzer._analyze_return
+_DISPATCH[KIND_BLOCK] = SemanticAnalyzer._analyze_block
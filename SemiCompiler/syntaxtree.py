@@ -42,20 +42,24 @@
 
 <arguments> ::= <expr> ("," <expr>)* '''
 
+#a small int per node class, stored on the class as KIND so passes can index a list with it
+(KIND_NUMBER, KIND_STRING, KIND_VARIABLE, KIND_BINARY_OP, KIND_ASSIGNMENT, KIND_IF,
+ KIND_WHILE, KIND_FUNCTION, KIND_FUNCTION_CALL, KIND_RETURN, KIND_BLOCK) = range(11)
+NODE_KINDS = KIND_BLOCK + 1
+
 class Node:
     #parent class for any node
-    def __int__(self):
-        #we dont need to do anything for the base class
-        pass
-    def __str___(self):
-        #returns the name of the subclass
-        return self.__class__.__name__
+    #empty slots so subclasses that declare their own slots do not get a __dict__ back
+    #it has no state or behaviour of its own, subclasses set their fields directly
+    __slots__ = ()
     
 class NumberNode(Node):
     #represents a number
+    __slots__ = ('value',)
+    KIND = KIND_NUMBER
+
     def __init__(self,value):
         #create a node and give it its value
-        super().__init__()
         self.value = value
 
     def __str__(self):
@@ -63,9 +67,11 @@ class NumberNode(Node):
     
 class StringNode(Node):
     #represents a literal strin
+    __slots__ = ('value',)
+    KIND = KIND_STRING
+
     def __init__(self,value):
         #create a node and give it its value
-        super().__init__()
         self.value = value
 
     def __str__(self):
@@ -73,8 +79,10 @@ class StringNode(Node):
 
 class VariableNode(Node):
     #represents a reference to a variable
+    __slots__ = ('name',)
+    KIND = KIND_VARIABLE
+
     def __init__(self, name):
-        super().__init__()
         self.name = name
     
     def __str__(self):
@@ -82,8 +90,11 @@ class VariableNode(Node):
 
 class BinaryOpNode(Node):
     #represents any operation that needs 2 operands
+    #the most common interior node in expression heavy code, keep each one small
+    __slots__ = ('left', 'op', 'right')
+    KIND = KIND_BINARY_OP
+
     def __init__(self, left, op, right):
-        super().__init__()
         self.left = left
         self.op = op
         self.right = right
@@ -93,8 +104,10 @@ class BinaryOpNode(Node):
     
 class AssignmentNode(Node):
     #represents any assignment
+    __slots__ = ('variable', 'value')
+    KIND = KIND_ASSIGNMENT
+
     def __init__(self, variable, value):
-        super().__init__()
         self.variable = variable
         self.value = value
     
@@ -103,8 +116,10 @@ class AssignmentNode(Node):
     
 class IfNode(Node):
     #represents any if statemnt
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+    KIND = KIND_IF
+
     def __init__(self, condition, then_branch, else_branch=None):
-        super().__init__()
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
@@ -119,8 +134,10 @@ class IfNode(Node):
 
 class WhileNode(Node):
     #represents a while loop
+    __slots__ = ('condition', 'body')
+    KIND = KIND_WHILE
+
     def __init__(self, condition, body):
-        super().__init__()
         self.condition = condition
         self.body = body
 
@@ -129,8 +146,10 @@ class WhileNode(Node):
     
 class FunctionNode(Node):
     #represents a function definition only
+    __slots__ = ('name', 'params', 'body')
+    KIND = KIND_FUNCTION
+
     def __init__(self, name, params, body):
-        super().__init__()
         self.name = name
         self.params = params
         self.body = body
@@ -140,8 +159,10 @@ class FunctionNode(Node):
     
 class FunctionCallNode(Node):
     #represents any function call
+    __slots__ = ('name', 'arguments')
+    KIND = KIND_FUNCTION_CALL
+
     def __init__(self, name, arguments):
-        super().__init__()
         self.name = name
         self.arguments = arguments
     
@@ -151,8 +172,10 @@ class FunctionCallNode(Node):
 
 class ReturnNode(Node):
     #represents a return statement
+    __slots__ = ('value',)
+    KIND = KIND_RETURN
+
     def __init__(self, value=None):
-        super().__init__()
         self.value = value
     
     def __str__(self):
@@ -160,8 +183,10 @@ class ReturnNode(Node):
     
 class BlockNode(Node):
     #represents a block of statements
+    __slots__ = ('statements',)
+    KIND = KIND_BLOCK
+
     def __init__(self, statements):
-        super().__init__()
         self.statements = statements
     
     def __str__(self):